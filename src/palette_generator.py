@@ -8,15 +8,20 @@ from __future__ import annotations
 import json
 import math
 import os
+import re
 import sqlite3
 import sys
+import threading
 import uuid
 import argparse
 import datetime
+from bisect import bisect_right
 from colorsys import hls_to_rgb, rgb_to_hls
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Tuple
+from string import Template
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
 
 # ── Type aliases ──────────────────────────────────────────────────────────────
 HarmonyType = Literal[
@@ -26,6 +31,8 @@ HarmonyType = Literal[
 
 DB_PATH = Path(os.environ.get("PALETTE_DB", Path.home() / ".blackroad" / "palettes.db"))
 
+_HEX_RE = re.compile(r"#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})")
+
 # ── Data models ───────────────────────────────────────────────────────────────
 @dataclass
 class ColorSwatch:
@@ -37,12 +44,51 @@ class ColorSwatch:
     saturation: float = 0.0
 
     def __post_init__(self) -> None:
-        r, g, b = hex_to_rgb(self.hex)
+        self._set_hls(*hex_to_rgb(self.hex))
+
+    def _set_hls(self, r: int, g: int, b: int) -> None:
         h, l, s = rgb_to_hls(r / 255, g / 255, b / 255)
         self.hue = round(h * 360, 2)
         self.lightness = round(l, 4)
         self.saturation = round(s, 4)
 
+    @classmethod
+    def from_hls(cls, h: float, l: float, s: float, name: str, role: str) -> "ColorSwatch":
+        """Build a swatch from HLS (h ∈ [0,360], l,s ∈ [0,1]) without re-parsing its hex.
+
+        The stored HLS fields are read back from the 8-bit colour actually
+        emitted, so they always agree with ``ColorSwatch(hex=...)``.
+        """
+        r, g, b = hls_to_rgb(h / 360, l, s)
+        r, g, b = int(r * 255), int(g * 255), int(b * 255)
+        sw = cls.__new__(cls)
+        sw.hex, sw.name, sw.role = rgb_to_hex(r, g, b), name, role
+        sw._set_hls(r, g, b)
+        return sw
+
+    def to_dict(self) -> dict:
+        return {
+            "hex": self.hex,
+            "name": self.name,
+            "role": self.role,
+            "hue": self.hue,
+            "lightness": self.lightness,
+            "saturation": self.saturation,
+        }
+
+    @classmethod
+    def _from_dict(cls, d: dict) -> "ColorSwatch":
+        """Rehydrate a stored swatch, trusting its saved HLS fields when present."""
+        if d.keys() != _SWATCH_FIELDS:
+            return cls(**d)
+        sw = cls.__new__(cls)
+        sw.hex, sw.name, sw.role = d["hex"], d["name"], d["role"]
+        sw.hue, sw.lightness, sw.saturation = d["hue"], d["lightness"], d["saturation"]
+        return sw
+
+
+_SWATCH_FIELDS = frozenset(("hex", "name", "role", "hue", "lightness", "saturation"))
+
 
 @dataclass
 class Palette:
@@ -61,25 +107,38 @@ class Palette:
             "name": self.name,
             "base_color": self.base_color,
             "harmony": self.harmony,
-            "colors": [asdict(c) for c in self.colors],
+            "colors": [c.to_dict() for c in self.colors],
             "tags": self.tags,
             "created_at": self.created_at,
             "description": self.description,
         }
 
+    def luminances(self) -> List[float]:
+        """Relative luminance of each swatch, parallel to ``colors``."""
+        return [relative_luminance(c.hex) for c in self.colors]
+
 
 # ── Low-level colour math ─────────────────────────────────────────────────────
+@lru_cache(maxsize=4096)
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Parse a #rrggbb or #rgb string into (r, g, b) ints 0-255."""
     h = hex_color.lstrip("#")
     if len(h) == 3:
         h = h[0]*2 + h[1]*2 + h[2]*2
-    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+    r, g, b = bytes.fromhex(h)
+    return r, g, b
 
 
 def rgb_to_hex(r: int, g: int, b: int) -> str:
-    r, g, b = max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
-    return f"#{r:02x}{g:02x}{b:02x}"
+    r = 0 if r < 0 else 255 if r > 255 else r
+    g = 0 if g < 0 else 255 if g > 255 else g
+    b = 0 if b < 0 else 255 if b > 255 else b
+    return _pack_hex(r, g, b)
+
+
+def _pack_hex(r: int, g: int, b: int) -> str:
+    """Format channels already known to be in 0-255; no clamping."""
+    return f"#{(r << 16) | (g << 8) | b:06x}"
 
 
 def hls_hex(h: float, l: float, s: float) -> str:
@@ -88,6 +147,20 @@ def hls_hex(h: float, l: float, s: float) -> str:
     return rgb_to_hex(int(r * 255), int(g * 255), int(b * 255))
 
 
+def _hls_hex_scale(h: float, s: float, lightnesses: Iterable[float]) -> List[str]:
+    """hls_hex for many lightness values at one hue and saturation.
+
+    For l, s ∈ [0,1] every HLS→RGB channel already lies in [0,1], so the
+    per-colour clamp in rgb_to_hex is skipped.
+    """
+    hue = h / 360
+    out: List[str] = []
+    for l in lightnesses:
+        r, g, b = hls_to_rgb(hue, l, s)
+        out.append(_pack_hex(int(r * 255), int(g * 255), int(b * 255)))
+    return out
+
+
 def rotate_hue(hex_color: str, degrees: float) -> str:
     r, g, b = hex_to_rgb(hex_color)
     h, l, s = rgb_to_hls(r / 255, g / 255, b / 255)
@@ -118,13 +191,25 @@ def blend_colors(hex1: str, hex2: str, ratio: float = 0.5) -> str:
 
 def generate_tints_shades(hex_color: str, steps: int = 9) -> List[str]:
     """Return a lightness scale from near-white to near-black at fixed hue."""
+    return list(_tints_shades(hex_color, steps))
+
+
+@lru_cache(maxsize=256)
+def _tints_shades(hex_color: str, steps: int) -> Tuple[str, ...]:
     r, g, b = hex_to_rgb(hex_color)
     h, _, s = rgb_to_hls(r / 255, g / 255, b / 255)
-    return [hls_hex(h * 360, 0.95 - i * (0.90 / (steps - 1)), s) for i in range(steps)]
+    step = 0.90 / (steps - 1)
+    return tuple(_hls_hex_scale(h * 360, s, (0.95 - i * step for i in range(steps))))
 
 
 def generate_gradient_stops(hex1: str, hex2: str, stops: int = 5) -> List[str]:
-    return [blend_colors(hex1, hex2, i / (stops - 1)) for i in range(stops)]
+    """Evenly spaced linear blends from hex1 to hex2, endpoints included."""
+    r1, g1, b1 = hex_to_rgb(hex1)
+    r2, g2, b2 = hex_to_rgb(hex2)
+    dr, dg, db = r2 - r1, g2 - g1, b2 - b1
+    n = stops - 1
+    return [_pack_hex(int(r1 + dr * t), int(g1 + dg * t), int(b1 + db * t))
+            for t in (i / n for i in range(stops))]
 
 
 # ── WCAG accessibility ────────────────────────────────────────────────────────
@@ -133,36 +218,78 @@ def _linearize(c: float) -> float:
     return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
 
 
+# Channels are 8-bit, so the sRGB transfer curve is tabulated once at import.
+_LIN_LUT: Tuple[float, ...] = tuple(_linearize(c) for c in range(256))
+
+
+@lru_cache(maxsize=4096)
 def relative_luminance(hex_color: str) -> float:
     r, g, b = hex_to_rgb(hex_color)
-    return 0.2126 * _linearize(r) + 0.7152 * _linearize(g) + 0.0722 * _linearize(b)
+    return 0.2126 * _LIN_LUT[r] + 0.7152 * _LIN_LUT[g] + 0.0722 * _LIN_LUT[b]
+
+
+def _luminance_ratio(l1: float, l2: float) -> float:
+    bright, dark = (l1, l2) if l1 >= l2 else (l2, l1)
+    return round((bright + 0.05) / (dark + 0.05), 2)
 
 
 def wcag_contrast_ratio(color1: str, color2: str) -> float:
     """Return WCAG 2.1 contrast ratio (1–21)."""
-    l1, l2 = relative_luminance(color1), relative_luminance(color2)
-    bright, dark = max(l1, l2), min(l1, l2)
-    return round((bright + 0.05) / (dark + 0.05), 2)
+    return _luminance_ratio(relative_luminance(color1), relative_luminance(color2))
+
+
+def _ratio_matrix(lums: List[float]) -> List[List[float]]:
+    """Symmetric ratio matrix from luminances; only the upper triangle is evaluated."""
+    n = len(lums)
+    matrix = [[1.0] * n for _ in range(n)]
+    for i in range(n):
+        li, row = lums[i], matrix[i]
+        for j in range(i + 1, n):
+            row[j] = matrix[j][i] = _luminance_ratio(li, lums[j])
+    return matrix
+
+
+_GRADE_THRESHOLDS = (3.0, 4.5, 7.0)
+_GRADE_LABELS     = ("Fail", "AA-Large", "AA", "AAA")
 
 
 def wcag_grade(ratio: float) -> str:
-    if ratio >= 7.0:  return "AAA"
-    if ratio >= 4.5:  return "AA"
-    if ratio >= 3.0:  return "AA-Large"
-    return "Fail"
+    return _GRADE_LABELS[bisect_right(_GRADE_THRESHOLDS, ratio)]
+
+
+_A11Y_SIDE: Dict[str, str] = {
+    **dict.fromkeys(("text", "primary", "secondary", "accent"), "fg"),
+    **dict.fromkeys(("background", "surface", "muted"), "bg"),
+}
 
 
 def a11y_check(palette: Palette) -> dict:
     """Full WCAG audit for every fg/bg combination in a palette."""
-    text_roles  = {"text", "primary", "secondary", "accent"}
-    bg_roles    = {"background", "surface", "muted"}
-    foregrounds = [s for s in palette.colors if s.role in text_roles] or palette.colors[:2]
-    backgrounds = [s for s in palette.colors if s.role in bg_roles]   or palette.colors[2:]
+    colors, lums = palette.colors, palette.luminances()
+    by_side: Dict[Optional[str], List[int]] = {"fg": [], "bg": [], None: []}
+    for i, s in enumerate(colors):
+        by_side[_A11Y_SIDE.get(s.role)].append(i)
+    # Without role hints, fall back to positions, never putting a swatch on both sides.
+    fg_idx, bg_idx = by_side["fg"], by_side["bg"]
+    if not fg_idx:
+        # Prefer unassigned swatches; otherwise borrow up to two backgrounds,
+        # always leaving at least one to test them against.
+        fg_idx = by_side[None][:2] or bg_idx[:min(2, len(bg_idx) - 1)]
+        bg_idx = [i for i in bg_idx if i not in fg_idx]
+    if not bg_idx:
+        fg_set = set(fg_idx)
+        bg_idx = [i for i in range(len(colors)) if i not in fg_set]
+        if not bg_idx:
+            # Every swatch is a foreground: keep up to two and test them against the rest.
+            k = min(2, len(fg_idx) - 1)
+            fg_idx, bg_idx = fg_idx[:k], fg_idx[k:]
+    foregrounds, fg_lums = [colors[i] for i in fg_idx], [lums[i] for i in fg_idx]
+    backgrounds, bg_lums = [colors[i] for i in bg_idx], [lums[i] for i in bg_idx]
 
     checks: List[dict] = []
-    for fg in foregrounds:
-        for bg in backgrounds:
-            ratio = wcag_contrast_ratio(fg.hex, bg.hex)
+    for fg, l1 in zip(foregrounds, fg_lums):
+        for bg, l2 in zip(backgrounds, bg_lums):
+            ratio = _luminance_ratio(l1, l2)
             checks.append({
                 "fg": {"name": fg.name, "hex": fg.hex},
                 "bg": {"name": bg.name, "hex": bg.hex},
@@ -198,63 +325,74 @@ _HARMONY_ANGLES: Dict[str, List[float]] = {
 }
 _ROLES = ["primary", "secondary", "accent", "quaternary",
           "background", "surface", "muted", "text"]
+# (hue offset, role) per harmony, resolved once at import.
+_HARMONY_SPEC: Dict[str, List[Tuple[float, str]]] = {
+    harmony: [(angle, _ROLES[i] if i < len(_ROLES) else f"color-{i+1}")
+              for i, angle in enumerate(angles)]
+    for harmony, angles in _HARMONY_ANGLES.items()
+}
+_MONO_STEPS: List[Tuple[float, str]] = [
+    (0.92, "background"), (0.75, "surface"), (0.55, "primary"),
+    (0.35, "secondary"), (0.15, "text"),
+]
 
 
 def generate(base_hex: str, harmony_type: str, name: str = "") -> Palette:
     """Main factory – returns a fully-populated Palette."""
-    h_str = base_hex.lstrip("#")
-    if len(h_str) == 3:
-        h_str = h_str[0]*2 + h_str[1]*2 + h_str[2]*2
-    if len(h_str) != 6:
+    m = _HEX_RE.fullmatch(base_hex)
+    if not m:
         raise ValueError(f"Invalid hex color: {base_hex!r}")
-    full = f"#{h_str}"
+    digits = m.group(1)
+    full = "#" + (digits if len(digits) == 6 else "".join(ch * 2 for ch in digits))
 
     if harmony_type not in _HARMONY_ANGLES:
         raise ValueError(f"Unknown harmony type: {harmony_type!r}")
 
     r, g, b = hex_to_rgb(full)
-    _, l, s = rgb_to_hls(r / 255, g / 255, b / 255)
-
-    swatches: List[ColorSwatch] = []
+    h, l, s = rgb_to_hls(r / 255, g / 255, b / 255)
+    h *= 360
 
+    prefix = name or "color"
     if harmony_type == "monochromatic":
-        steps = [(0.92, "background"), (0.75, "surface"), (0.55, "primary"),
-                 (0.35, "secondary"), (0.15, "text")]
-        for i, (lv, role) in enumerate(steps):
-            c = adjust_lightness(full, lv - l)
-            swatches.append(ColorSwatch(hex=c, name=f"{name or 'color'}-{i+1}", role=role))
+        # l + (lv - l) is not always bit-identical to lv; keep adjust_lightness's arithmetic.
+        swatches = [ColorSwatch.from_hls(h, max(0.0, min(1.0, l + (lv - l))), s,
+                                         f"{prefix}-{i+1}", role)
+                    for i, (lv, role) in enumerate(_MONO_STEPS)]
     else:
-        for i, angle in enumerate(_HARMONY_ANGLES[harmony_type]):
-            c = rotate_hue(full, angle)
-            role = _ROLES[i] if i < len(_ROLES) else f"color-{i+1}"
-            swatches.append(ColorSwatch(hex=c, name=f"{name or 'color'}-{i+1}", role=role))
-        swatches.append(ColorSwatch(adjust_lightness(full, 0.38), f"{name or 'color'}-light",  "background"))
-        swatches.append(ColorSwatch(adjust_lightness(full, -0.38), f"{name or 'color'}-dark", "text"))
+        swatches = [ColorSwatch.from_hls((h + angle) % 360, l, s, f"{prefix}-{i+1}", role)
+                    for i, (angle, role) in enumerate(_HARMONY_SPEC[harmony_type])]
+        swatches.append(ColorSwatch.from_hls(h, min(1.0, l + 0.38), s, f"{prefix}-light", "background"))
+        swatches.append(ColorSwatch.from_hls(h, max(0.0, l - 0.38), s, f"{prefix}-dark",  "text"))
 
     return Palette(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4().hex,
         name=name or f"{harmony_type.title()} Palette",
         base_color=full,
         harmony=harmony_type,
         colors=swatches,
         tags=[harmony_type],
-        created_at=datetime.datetime.utcnow().isoformat(),
+        created_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
     )
 
 
 # ── Semantic colour suggestions ───────────────────────────────────────────────
 def suggest_semantic(palette: Palette) -> Dict[str, str]:
     """Return success/warning/error/info hex values tuned to base hue's lightness."""
-    r, g, b = hex_to_rgb(palette.base_color)
+    return dict(_semantic_for(palette.base_color))
+
+
+@lru_cache(maxsize=256)
+def _semantic_for(base_color: str) -> Tuple[Tuple[str, str], ...]:
+    r, g, b = hex_to_rgb(base_color)
     _, l, s = rgb_to_hls(r / 255, g / 255, b / 255)
     adj = max(0.55, s)
     tgt = max(0.35, min(0.60, l))
-    return {
-        "success": hls_hex(120, tgt, adj),
-        "warning": hls_hex(38,  tgt, adj),
-        "error":   hls_hex(4,   tgt, adj),
-        "info":    hls_hex(207, tgt, adj),
-    }
+    return (
+        ("success", hls_hex(120, tgt, adj)),
+        ("warning", hls_hex(38,  tgt, adj)),
+        ("error",   hls_hex(4,   tgt, adj)),
+        ("info",    hls_hex(207, tgt, adj)),
+    )
 
 
 def suggest_neutral(palette: Palette) -> str:
@@ -264,66 +402,113 @@ def suggest_neutral(palette: Palette) -> str:
 
 
 # ── Export functions ──────────────────────────────────────────────────────────
+_SCALE_NUMS = (50, 100, 200, 300, 400, 500, 600, 700, 800, 900)
+
+# Fixed export skeletons. Each $block is a run of lines that carry their own
+# leading newline, so an empty block leaves no blank line behind.
+_CSS_TEMPLATE = Template("""\
+:root {
+  /* $name – $harmony */$roles
+}
+
+/* $name tint/shade scale */
+:root {$scale
+}
+
+/* Semantic tokens */
+:root {$semantic
+}""")
+
+_TW_TEMPLATE = Template("""\
+/** @type {import('tailwindcss').Config} */
+module.exports = {
+  theme: {
+    extend: {
+      colors: {
+        '$pname': {$scale
+        },
+        '$pname-roles': {$roles
+        },
+      },
+    },
+  },
+};""")
+
+
 def to_css_vars(palette: Palette, prefix: str = "palette") -> str:
-    lines = [f":root {{", f"  /* {palette.name} – {palette.harmony} */"]
-    for sw in palette.colors:
-        slug = sw.name.lower().replace(" ", "-")
-        r, g, b = hex_to_rgb(sw.hex)
-        lines.append(f"  --{prefix}-{slug}: {sw.hex};")
-        lines.append(f"  --{prefix}-{slug}-rgb: {r}, {g}, {b};")
-    lines += ["}", "", f"/* {palette.name} tint/shade scale */", ":root {"]
-    nums  = [50, 100, 200, 300, 400, 500, 600, 700, 800, 900]
+    slugs = [sw.name.lower().replace(" ", "-") for sw in palette.colors]
+    rgbs  = [hex_to_rgb(sw.hex) for sw in palette.colors]
     scale = generate_tints_shades(palette.base_color, 9)
-    for num, hex_val in zip(nums, scale):
-        lines.append(f"  --{prefix}-{num}: {hex_val};")
-    lines.append("}")
-    sem = suggest_semantic(palette)
-    lines += ["", "/* Semantic tokens */", ":root {"]
-    for name, val in sem.items():
-        lines.append(f"  --{prefix}-{name}: {val};")
-    lines.append("}")
-    return "\n".join(lines)
+    sem   = suggest_semantic(palette)
+    return _CSS_TEMPLATE.substitute(
+        name=palette.name,
+        harmony=palette.harmony,
+        roles="".join(f"\n  --{prefix}-{slug}: {sw.hex};\n  --{prefix}-{slug}-rgb: {r}, {g}, {b};"
+                      for sw, slug, (r, g, b) in zip(palette.colors, slugs, rgbs)),
+        scale="".join(f"\n  --{prefix}-{num}: {hex_val};" for num, hex_val in zip(_SCALE_NUMS, scale)),
+        semantic="".join(f"\n  --{prefix}-{name}: {val};" for name, val in sem.items()),
+    )
 
 
 def to_tailwind(palette: Palette) -> str:
     scale = generate_tints_shades(palette.base_color, 9)
-    pname = palette.name.lower().replace(" ", "-")
-    nums  = [50, 100, 200, 300, 400, 500, 600, 700, 800, 900]
-    lines = [
-        "/** @type {import('tailwindcss').Config} */",
-        "module.exports = {", "  theme: {", "    extend: {", "      colors: {",
-        f"        '{pname}': {{",
-    ]
-    for num, hex_val in zip(nums, scale):
-        lines.append(f"          {num}: '{hex_val}',")
-    lines.append("        },")
-    lines.append(f"        '{pname}-roles': {{")
-    for sw in palette.colors:
-        lines.append(f"          '{sw.role}': '{sw.hex}',")
-    lines += ["        },", "      },", "    },", "  },", "};"]
-    return "\n".join(lines)
-
-
-def export_json(palette: Palette) -> str:
+    return _TW_TEMPLATE.substitute(
+        pname=palette.name.lower().replace(" ", "-"),
+        scale="".join(f"\n          {num}: '{hex_val}'," for num, hex_val in zip(_SCALE_NUMS, scale)),
+        roles="".join(f"\n          '{sw.role}': '{sw.hex}'," for sw in palette.colors),
+    )
+
+
+def export_json(palette: Palette, compact: bool = False) -> str:
+    """Full JSON export; ``compact`` drops indentation and whitespace."""
     data = palette.to_dict()
     data["scale"] = generate_tints_shades(palette.base_color)
     data["semantic"] = suggest_semantic(palette)
     data["neutral"]  = suggest_neutral(palette)
+    ratios = _ratio_matrix(palette.luminances())
     matrix: Dict[str, dict] = {}
-    for s1 in palette.colors:
+    for s1, row in zip(palette.colors, ratios):
         matrix[s1.name] = {}
-        for s2 in palette.colors:
+        for s2, ratio in zip(palette.colors, row):
             if s1.name != s2.name:
-                ratio = wcag_contrast_ratio(s1.hex, s2.hex)
                 matrix[s1.name][s2.name] = {"ratio": ratio, "grade": wcag_grade(ratio)}
     data["contrast_matrix"] = matrix
+    if compact:
+        return json.dumps(data, separators=(",", ":"))
     return json.dumps(data, indent=2)
 
 
 # ── SQLite persistence ────────────────────────────────────────────────────────
+# sqlite3 connections may only be used by the thread that opened them, so the
+# cache is keyed by (resolved path, thread id).
+_CONNECTIONS: Dict[Tuple[Path, int], sqlite3.Connection] = {}
+
+
 def _db(path: Path = DB_PATH) -> sqlite3.Connection:
+    """Return the calling thread's shared connection for *path*, opening it on first use."""
+    key = (Path(path).resolve(), threading.get_ident())
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        conn = _CONNECTIONS[key] = _connect(key[0])
+    return conn
+
+
+def close_db(db_path: Optional[Path] = None) -> None:
+    """Close the calling thread's cached connection for *db_path*, or all of them.
+
+    Connections opened by other threads are left alone; each thread closes its own.
+    """
+    tid = threading.get_ident()
+    path = None if db_path is None else Path(db_path).resolve()
+    for key in [k for k in _CONNECTIONS if k[1] == tid and path in (None, k[0])]:
+        _CONNECTIONS.pop(key).close()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
     path.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS palettes (
             id TEXT PRIMARY KEY,
@@ -334,19 +519,30 @@ def _db(path: Path = DB_PATH) -> sqlite3.Connection:
             tags TEXT DEFAULT '',
             created_at TEXT NOT NULL
         )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_palettes_created ON palettes(created_at DESC)")
     conn.commit()
     return conn
 
 
+def _palette_row(palette: Palette) -> tuple:
+    return (palette.id, palette.name, palette.base_color, palette.harmony,
+            json.dumps([c.to_dict() for c in palette.colors], separators=(",", ":")),
+            ",".join(palette.tags), palette.created_at)
+
+
 def save_palette(palette: Palette, db_path: Path = DB_PATH) -> None:
     conn = _db(db_path)
-    conn.execute(
-        "INSERT OR REPLACE INTO palettes VALUES (?,?,?,?,?,?,?)",
-        (palette.id, palette.name, palette.base_color, palette.harmony,
-         json.dumps([asdict(c) for c in palette.colors]),
-         ",".join(palette.tags), palette.created_at),
-    )
-    conn.commit(); conn.close()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO palettes VALUES (?,?,?,?,?,?,?)",
+                     _palette_row(palette))
+
+
+def save_palettes(palettes: Iterable[Palette], db_path: Path = DB_PATH) -> None:
+    """Save many palettes in a single transaction."""
+    conn = _db(db_path)
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO palettes VALUES (?,?,?,?,?,?,?)",
+                         (_palette_row(p) for p in palettes))
 
 
 def load_palette(palette_id: str, db_path: Path = DB_PATH) -> Optional[Palette]:
@@ -355,32 +551,34 @@ def load_palette(palette_id: str, db_path: Path = DB_PATH) -> Optional[Palette]:
         "SELECT id,name,base_color,harmony,data,tags,created_at FROM palettes WHERE id=?",
         (palette_id,),
     ).fetchone()
-    conn.close()
     if not row:
         return None
     pid, name, base, harmony, data, tags, created_at = row
     return Palette(
         id=pid, name=name, base_color=base, harmony=harmony,
-        colors=[ColorSwatch(**c) for c in json.loads(data)],
+        colors=[ColorSwatch._from_dict(c) for c in json.loads(data)],
         tags=tags.split(",") if tags else [],
         created_at=created_at,
     )
 
 
-def list_palettes(db_path: Path = DB_PATH) -> List[dict]:
+def list_palettes(db_path: Path = DB_PATH, limit: Optional[int] = None,
+                  offset: int = 0) -> List[dict]:
+    """Newest-first summaries; ``limit=None`` returns every row after ``offset``."""
     conn = _db(db_path)
     rows = conn.execute(
-        "SELECT id,name,base_color,harmony,tags,created_at FROM palettes ORDER BY created_at DESC"
-    ).fetchall()
-    conn.close()
+        "SELECT id,name,base_color,harmony,tags,created_at FROM palettes "
+        "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+        (-1 if limit is None else limit, offset),
+    )
     return [{"id": r[0],"name": r[1],"base_color": r[2],"harmony": r[3],
              "tags": r[4],"created_at": r[5]} for r in rows]
 
 
 def delete_palette(palette_id: str, db_path: Path = DB_PATH) -> bool:
     conn = _db(db_path)
-    cur = conn.execute("DELETE FROM palettes WHERE id=?", (palette_id,))
-    conn.commit(); conn.close()
+    with conn:
+        cur = conn.execute("DELETE FROM palettes WHERE id=?", (palette_id,))
     return cur.rowcount > 0
 
 
@@ -426,11 +624,14 @@ examples:
 
     p_ex  = sub.add_parser("export",   help="Export as JSON")
     p_ex.add_argument("palette_id")
+    p_ex.add_argument("--compact", action="store_true")
 
     p_a11= sub.add_parser("a11y",      help="WCAG accessibility report")
     p_a11.add_argument("palette_id")
 
-    sub.add_parser("list", help="List saved palettes")
+    p_ls  = sub.add_parser("list",     help="List saved palettes")
+    p_ls.add_argument("--limit", type=int, default=None)
+    p_ls.add_argument("--offset", type=int, default=0)
 
     p_con = sub.add_parser("contrast", help="Contrast ratio between two colours")
     p_con.add_argument("color1")
@@ -467,7 +668,7 @@ examples:
     elif args.cmd == "export":
         p = load_palette(args.palette_id)
         if not p: sys.exit(f"❌ not found: {args.palette_id}")
-        print(export_json(p))
+        print(export_json(p, compact=args.compact))
 
     elif args.cmd == "a11y":
         p = load_palette(args.palette_id)
@@ -475,7 +676,7 @@ examples:
         print(json.dumps(a11y_check(p), indent=2))
 
     elif args.cmd == "list":
-        rows = list_palettes()
+        rows = list_palettes(limit=args.limit, offset=args.offset)
         if not rows: print("(no palettes saved)")
         else:
             print(f"{'id':<38} {'name':<28} {'harmony':<20} base")
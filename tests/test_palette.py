@@ -10,8 +10,8 @@ from palette_generator import (
     adjust_saturation, blend_colors, generate_tints_shades,
     generate_gradient_stops, relative_luminance, wcag_contrast_ratio,
     wcag_grade, a11y_check, generate, to_css_vars, to_tailwind, export_json,
-    save_palette, load_palette, list_palettes, delete_palette,
-    suggest_semantic, suggest_neutral,
+    save_palette, save_palettes, load_palette, close_db, _db, _ratio_matrix, list_palettes, delete_palette,
+    suggest_semantic, suggest_neutral, ColorSwatch, Palette,
 )
 
 
@@ -25,6 +25,11 @@ def test_hex_to_rgb_short():
 def test_hex_to_rgb_no_hash():
     assert hex_to_rgb("000000") == (0, 0, 0)
 
+@pytest.mark.parametrize("bad", ["#12345", "#gggggg", "#1234567a"])
+def test_hex_to_rgb_invalid(bad):
+    with pytest.raises(ValueError):
+        hex_to_rgb(bad)
+
 def test_rgb_to_hex_roundtrip():
     assert rgb_to_hex(59, 130, 246) == "#3b82f6"
 
@@ -56,11 +61,27 @@ def test_tints_shades_length():
     scale = generate_tints_shades("#3b82f6", 9)
     assert len(scale) == 9
 
+def test_tints_shades_match_hls_hex():
+    from colorsys import rgb_to_hls
+    r, g, b = hex_to_rgb("#e11d48")
+    h, _, s = rgb_to_hls(r/255, g/255, b/255)
+    expected = [hls_hex(h * 360, 0.95 - i * (0.90 / 6), s) for i in range(7)]
+    assert generate_tints_shades("#e11d48", 7) == expected
+
+def test_tints_shades_cached_result_not_shared():
+    scale = generate_tints_shades("#3b82f6", 9)
+    scale[0] = "#000000"
+    assert generate_tints_shades("#3b82f6", 9)[0] != "#000000"
+
 def test_gradient_stops():
     stops = generate_gradient_stops("#000000", "#ffffff", 3)
     assert stops[0] == "#000000"
     assert stops[-1] == "#ffffff"
 
+def test_gradient_stops_match_blend():
+    stops = generate_gradient_stops("#3b82f6", "#e11d48", 6)
+    assert stops == [blend_colors("#3b82f6", "#e11d48", i / 5) for i in range(6)]
+
 
 # ── WCAG ─────────────────────────────────────────────────────────────────────
 def test_black_white_contrast():
@@ -76,6 +97,10 @@ def test_wcag_grades():
     assert wcag_grade(4.5)  == "AA"
     assert wcag_grade(3.0)  == "AA-Large"
     assert wcag_grade(2.5)  == "Fail"
+    assert wcag_grade(7.0)  == "AAA"
+    assert wcag_grade(6.99) == "AA"
+    assert wcag_grade(4.49) == "AA-Large"
+    assert wcag_grade(1.0)  == "Fail"
 
 def test_relative_luminance_white():
     assert abs(relative_luminance("#ffffff") - 1.0) < 0.001
@@ -83,6 +108,15 @@ def test_relative_luminance_white():
 def test_relative_luminance_black():
     assert abs(relative_luminance("#000000")) < 0.001
 
+def test_ratio_matrix_matches_pairwise():
+    p = generate("#3b82f6", "tetradic")
+    hexes = [sw.hex for sw in p.colors]
+    m = _ratio_matrix(p.luminances())
+    assert len(m) == len(hexes) and all(len(row) == len(hexes) for row in m)
+    for i, a in enumerate(hexes):
+        for j, b in enumerate(hexes):
+            assert m[i][j] == wcag_contrast_ratio(a, b)
+
 
 # ── Palette generation ────────────────────────────────────────────────────────
 @pytest.mark.parametrize("harmony", [
@@ -101,6 +135,11 @@ def test_generate_invalid_hex():
     with pytest.raises(ValueError):
         generate("zzzzzz", "triadic")
 
+@pytest.mark.parametrize("bad", ["#12345", "##3b82f6", "#3b82f6\n", "3b82f"])
+def test_generate_rejects_malformed_hex(bad):
+    with pytest.raises(ValueError, match="Invalid hex color"):
+        generate(bad, "triadic")
+
 def test_generate_short_hex():
     p = generate("#f00", "complementary")
     assert len(p.colors) >= 2
@@ -109,6 +148,36 @@ def test_generate_invalid_harmony():
     with pytest.raises(ValueError):
         generate("#3b82f6", "rainbow")
 
+def test_swatch_from_hls_matches_hex():
+    sw = ColorSwatch.from_hls(217.0, 0.6, 0.9, "blue", "primary")
+    assert sw.hex == hls_hex(217.0, 0.6, 0.9)
+    assert sw == ColorSwatch(hex=sw.hex, name="blue", role="primary")
+
+@pytest.mark.parametrize("base", ["#3b82f6", "#61ff89", "#fefefe", "#ffffff",
+                                  "#010101", "#000000", "#808080", "#f00"])
+@pytest.mark.parametrize("harmony", [
+    "complementary","triadic","analogous",
+    "monochromatic","split-complementary","tetradic",
+])
+def test_generated_swatch_hls_matches_hex(base, harmony):
+    for sw in generate(base, harmony).colors:
+        assert sw == ColorSwatch(hex=sw.hex, name=sw.name, role=sw.role)
+
+def test_generate_matches_reference_adjustments():
+    import random
+    from colorsys import rgb_to_hls
+    rng = random.Random(0)
+    bases = ["#c45f2a"] + [f"#{rng.randrange(1 << 24):06x}" for _ in range(2000)]
+    mono_steps = [0.92, 0.75, 0.55, 0.35, 0.15]
+    for base in bases:
+        r, g, b = hex_to_rgb(base)
+        _, l, _ = rgb_to_hls(r/255, g/255, b/255)
+        mono = [sw.hex for sw in generate(base, "monochromatic").colors]
+        assert mono == [adjust_lightness(base, lv - l) for lv in mono_steps], base
+        comp = [sw.hex for sw in generate(base, "tetradic").colors]
+        assert comp == [rotate_hue(base, a) for a in (0, 90, 180, 270)] + \
+            [adjust_lightness(base, 0.38), adjust_lightness(base, -0.38)], base
+
 def test_generate_unique_ids():
     p1 = generate("#3b82f6", "triadic")
     p2 = generate("#3b82f6", "triadic")
@@ -136,6 +205,13 @@ def test_export_json_valid():
     assert "contrast_matrix" in data
     assert "semantic" in data
 
+def test_export_json_compact():
+    import json
+    p = generate("#3b82f6", "triadic", "Blue")
+    compact = export_json(p, compact=True)
+    assert "\n" not in compact and ", " not in compact
+    assert json.loads(compact) == json.loads(export_json(p))
+
 
 # ── a11y ─────────────────────────────────────────────────────────────────────
 def test_a11y_check_structure():
@@ -145,6 +221,36 @@ def test_a11y_check_structure():
     assert "summary" in result
     assert result["summary"]["total"] >= 0
 
+def test_a11y_check_fallback_does_not_overlap():
+    colors = [ColorSwatch("#000000", "a", "primary"), ColorSwatch("#111111", "b", "secondary"),
+              ColorSwatch("#ffffff", "c", "accent"), ColorSwatch("#eeeeee", "d", "quaternary")]
+    result = a11y_check(Palette("x", "x", "#000000", "custom", colors=colors))
+    pairs = {(c["fg"]["name"], c["bg"]["name"]) for c in result["checks"]}
+    assert pairs == {(fg, "d") for fg in "abc"}
+
+def test_a11y_check_all_background_roles():
+    colors = [ColorSwatch("#ffffff", "a", "background"), ColorSwatch("#eeeeee", "b", "surface"),
+              ColorSwatch("#111111", "c", "muted")]
+    result = a11y_check(Palette("x", "x", "#ffffff", "custom", colors=colors))
+    pairs = {(c["fg"]["name"], c["bg"]["name"]) for c in result["checks"]}
+    assert pairs == {("a", "c"), ("b", "c")}
+    assert result["summary"]["pass_aa"] == 2
+
+def test_a11y_check_all_foreground_roles():
+    colors = [ColorSwatch("#000000", "a", "primary"), ColorSwatch("#111111", "b", "secondary"),
+              ColorSwatch("#ffffff", "c", "accent"), ColorSwatch("#222222", "d", "text")]
+    result = a11y_check(Palette("x", "x", "#000000", "custom", colors=colors))
+    pairs = {(c["fg"]["name"], c["bg"]["name"]) for c in result["checks"]}
+    assert pairs == {("a", "c"), ("a", "d"), ("b", "c"), ("b", "d")}
+    assert result["summary"]["pass_aa"] == 2
+
+def test_a11y_check_no_roles_uses_positions():
+    colors = [ColorSwatch(h, f"c{i}", "custom") for i, h in
+              enumerate(["#000000", "#222222", "#ffffff", "#dddddd"])]
+    result = a11y_check(Palette("x", "x", "#000000", "custom", colors=colors))
+    pairs = {(c["fg"]["name"], c["bg"]["name"]) for c in result["checks"]}
+    assert pairs == {("c0", "c2"), ("c0", "c3"), ("c1", "c2"), ("c1", "c3")}
+
 
 # ── Semantic / neutral ────────────────────────────────────────────────────────
 def test_suggest_semantic_keys():
@@ -152,6 +258,10 @@ def test_suggest_semantic_keys():
     sem = suggest_semantic(p)
     assert set(sem.keys()) == {"success", "warning", "error", "info"}
 
+def test_palette_luminances_parallel_to_colors():
+    p = generate("#3b82f6", "tetradic")
+    assert p.luminances() == [relative_luminance(sw.hex) for sw in p.colors]
+
 def test_suggest_neutral_hex():
     p = generate("#3b82f6", "triadic")
     n = suggest_neutral(p)
@@ -161,7 +271,27 @@ def test_suggest_neutral_hex():
 # ── Persistence ───────────────────────────────────────────────────────────────
 @pytest.fixture
 def tmp_db(tmp_path):
-    return tmp_path / "test_palettes.db"
+    path = tmp_path / "test_palettes.db"
+    yield path
+    close_db(path)
+
+def test_db_connection_shared_per_file(tmp_db):
+    assert _db(tmp_db) is _db(tmp_db.parent / "." / tmp_db.name)
+    close_db(tmp_db)
+    assert load_palette("missing", tmp_db) is None
+
+def test_db_usable_from_another_thread(tmp_db):
+    import threading
+    p = generate("#3b82f6", "triadic", "Threaded")
+    save_palette(p, tmp_db)
+    result = {}
+    def worker():
+        result["name"] = load_palette(p.id, tmp_db).name
+        close_db(tmp_db)
+    t = threading.Thread(target=worker)
+    t.start(); t.join()
+    assert result["name"] == "Threaded"
+    assert _db(tmp_db) is _db(tmp_db)
 
 def test_save_and_load(tmp_db):
     p = generate("#3b82f6", "triadic", "Persisted")
@@ -172,6 +302,19 @@ def test_save_and_load(tmp_db):
     assert loaded.harmony == "triadic"
     assert len(loaded.colors) == len(p.colors)
 
+def test_save_and_load_preserves_swatches(tmp_db):
+    p = generate("#e11d48", "tetradic", "Roundtrip")
+    save_palette(p, tmp_db)
+    loaded = load_palette(p.id, tmp_db).colors
+    assert loaded == p.colors
+    assert loaded == [ColorSwatch(hex=sw.hex, name=sw.name, role=sw.role) for sw in loaded]
+
+def test_swatch_from_dict_rejects_unknown_keys():
+    with pytest.raises(TypeError):
+        ColorSwatch._from_dict({"hex": "#000000", "name": "a", "role": "text",
+                                "hue": 0.0, "lightness": 0.0, "saturation": 0.0,
+                                "extra": 1})
+
 def test_load_nonexistent(tmp_db):
     assert load_palette("does-not-exist", tmp_db) is None
 
@@ -181,6 +324,21 @@ def test_list_palettes(tmp_db):
     rows = list_palettes(tmp_db)
     assert len(rows) == 2
 
+def test_list_palettes_limit_offset(tmp_db):
+    pals = [generate("#3b82f6", "triadic", f"P{i}") for i in range(5)]
+    for i, p in enumerate(pals):
+        p.created_at = f"2024-01-0{i+1}T00:00:00+00:00"
+    save_palettes(pals, tmp_db)
+    assert [r["name"] for r in list_palettes(tmp_db, limit=2)] == ["P4", "P3"]
+    assert [r["name"] for r in list_palettes(tmp_db, limit=2, offset=2)] == ["P2", "P1"]
+    assert [r["name"] for r in list_palettes(tmp_db, offset=3)] == ["P1", "P0"]
+
+def test_save_palettes_batch(tmp_db):
+    pals = [generate("#3b82f6", h) for h in ("complementary", "triadic", "tetradic")]
+    save_palettes(pals, tmp_db)
+    assert len(list_palettes(tmp_db)) == 3
+    assert load_palette(pals[1].id, tmp_db).harmony == "triadic"
+
 def test_delete_palette(tmp_db):
     p = generate("#00ff00", "analogous")
     save_palette(p, tmp_db)